@@ -4,8 +4,10 @@ Flask Starter Application Package
 import os
 from flask import Flask, jsonify
 from flask_cors import CORS
+from flask_caching import Cache
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from flask_bcrypt import Bcrypt
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,6 +16,8 @@ load_dotenv()
 # Initialize extensions
 migrate = Migrate()
 jwt = JWTManager()
+cache = Cache()
+bcrypt = Bcrypt()
 
 
 def create_app(config_name='development'):
@@ -28,6 +32,52 @@ def create_app(config_name='development'):
         'DATABASE_URL', 'sqlite:///app.db'
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Password hashing cost (bcrypt work factor)
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+
+    # Tests get their own database, in memory unless TEST_DATABASE_URL is set,
+    # and the cheapest hashing cost bcrypt allows
+    if config_name == 'testing':
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
+            'TEST_DATABASE_URL', 'sqlite:///:memory:'
+        )
+        app.config['BCRYPT_LOG_ROUNDS'] = 4
+
+    # Compiled statement cache, sized for the distinct list/search query shapes
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    engine_options = {
+        'query_cache_size': int(os.getenv('DB_QUERY_CACHE_SIZE', 1200))
+    }
+
+    # Connection pooling for server databases (SQLite picks its own pool)
+    if not database_uri.startswith('sqlite'):
+        engine_options.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 20)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 40)),
+            'pool_pre_ping': True,
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            'pool_use_lifo': True
+        })
+        if database_uri.startswith('postgres'):
+            statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT', 5000))
+            engine_options['connect_args'] = {
+                'options': f'-c statement_timeout={statement_timeout}'
+            }
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # Response cache: Redis only. Invalidation has to reach every worker,
+    # so without a shared backend list pages are not cached at all
+    redis_url = os.getenv('REDIS_URL')
+    if redis_url and config_name != 'testing':
+        app.config['CACHE_TYPE'] = 'RedisCache'
+        app.config['CACHE_REDIS_URL'] = redis_url
+    else:
+        app.config['CACHE_TYPE'] = 'NullCache'
+    app.config['CACHE_KEY_PREFIX'] = 'flask_starter:'
+    app.config['CACHE_DEFAULT_TIMEOUT'] = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 30))
+
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = int(
         os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600)
@@ -38,6 +88,8 @@ def create_app(config_name='development'):
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    cache.init_app(app)
+    bcrypt.init_app(app)
 
     # CORS configuration
     cors_origins = os.getenv('CORS_ORIGINS', '').split(',')
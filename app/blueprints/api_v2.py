@@ -1,9 +1,13 @@
 """
 API V2 Blueprint - Enhanced RESTful API with pagination and validation
 """
-from flask import Blueprint, request
+import orjson
+from flask import Blueprint, request, current_app, make_response
 from flask_restx import Api, Resource, fields, namespace
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from app.models import db
 from app.models.user import User, Post
 from app.utils.pagination import (
@@ -11,14 +15,31 @@ from app.utils.pagination import (
     build_search_params,
     apply_filters,
     apply_search,
-    apply_sorting
+    apply_sorting,
+    get_sort_column,
+    bounded_count
 )
+from app.utils.helpers import get_current_user
+from app.utils.cache import cached_list
 from app.schemas import (
     UserSchema, UserUpdateSchema, PostSchema, PostUpdateSchema,
     LoginSchema, PaginationSchema
 )
 from marshmallow import ValidationError
 
+# Schemas are stateless for load(), so build them once rather than per request
+user_schema = UserSchema()
+user_update_schema = UserUpdateSchema()
+post_schema = PostSchema()
+post_update_schema = PostUpdateSchema()
+login_schema = LoginSchema()
+
+# Post counts above this are reported as the cap with post_count_capped set
+POST_COUNT_CAP = 100
+
+# Posts are serialized with their author's username; join it in the same query
+with_author_username = joinedload(Post.author).load_only(User.username)
+
 api_v2_bp = Blueprint('api_v2', __name__)
 api = Api(api_v2_bp,
           version='2.0',
@@ -27,6 +48,19 @@ api = Api(api_v2_bp,
           doc='/docs',
           prefix='/api/v2')
 
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Encode responses with orjson (naive datetimes are UTC, ISO 8601)"""
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE
+    if current_app.debug:
+        option |= orjson.OPT_INDENT_2
+
+    resp = make_response(orjson.dumps(data, option=option), code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
 # Namespaces
 users_ns = api.namespace('users', description='User operations V2')
 posts_ns = api.namespace('posts', description='Post operations V2')
@@ -65,7 +99,8 @@ pagination_model = api.model('Pagination', {
     'has_next': fields.Boolean(description='Has next page'),
     'has_prev': fields.Boolean(description='Has previous page'),
     'next_page': fields.Integer(description='Next page number'),
-    'prev_page': fields.Integer(description='Previous page number')
+    'prev_page': fields.Integer(description='Previous page number'),
+    'next_cursor': fields.String(description='Cursor for the next page')
 })
 
 user_list_model_v2 = api.model('UserListV2', {
@@ -90,6 +125,10 @@ class UserListV2(Resource):
     @api.param('q', 'Search query')
     @api.param('sort', 'Sort field', default='created_at')
     @api.param('order', 'Sort order (asc/desc)', default='desc')
+    @api.param('cursor', 'Cursor from meta.next_cursor (keyset pagination)')
+    @api.param('include_total', 'Include total count with cursor (1)', type='integer')
+    @api.param('exact_count', 'Count exactly on large tables (1)', type='integer')
+    @cached_list('users', 'posts')
     def get(self):
         """
         List all users with pagination and search
@@ -100,23 +139,33 @@ class UserListV2(Resource):
         - Sorting (sort, order)
         - Filtering by any field
         """
-        query = User.query
+        # Count posts in the same query to avoid one COUNT per user
+        query = db.session.query(
+            User, func.count(Post.id).label('post_count')
+        ).outerjoin(Post, Post.user_id == User.id).group_by(User.id)
 
         # Apply search, filters, and sorting
-        filters, search_query, sort_field, sort_dir = build_search_params(
-            User,
-            search_fields=['username', 'email', 'first_name', 'last_name']
-        )
+        try:
+            filters, search_query, sort_field, sort_dir = build_search_params(
+                User,
+                search_fields=User.__search_fields__
+            )
+        except ValidationError as err:
+            return {'error': 'Validation failed', 'messages': err.messages}, 400
 
-        query = apply_search(query, User, search_query, ['username', 'email', 'first_name', 'last_name'])
+        query = apply_search(query, User, search_query, User.__search_fields__)
         query = apply_filters(query, User, filters)
         query = apply_sorting(query, User, sort_field, sort_dir)
 
         # Paginate
-        result = paginate_query(query, serializer=lambda u: {
-            **u.to_dict(),
-            'post_count': u.posts.count()
-        })
+        try:
+            result = paginate_query(query, serializer=lambda row: {
+                **row.User.to_dict(),
+                'post_count': min(row.post_count, POST_COUNT_CAP),
+                'post_count_capped': row.post_count > POST_COUNT_CAP
+            }, sort_column=get_sort_column(User, sort_field), sort_dir=sort_dir)
+        except ValidationError as err:
+            return {'error': 'Validation failed', 'messages': err.messages}, 400
 
         return result
 
@@ -134,12 +183,18 @@ class UserListV2(Resource):
         - Password strength
         - Field lengths
         """
-        schema = UserSchema()
         try:
-            data = schema.load(request.get_json())
+            data = user_schema.load(request.get_json())
         except ValidationError as err:
             return {'error': 'Validation failed', 'messages': err.messages}, 400
 
+        conflict = User.find_conflict(username=data['username'], email=data['email'])
+        if conflict:
+            return {
+                'error': 'Validation failed',
+                'messages': {conflict: [f'{conflict.capitalize()} already exists']}
+            }, 400
+
         user = User(
             username=data['username'],
             email=data['email'],
@@ -147,7 +202,11 @@ class UserListV2(Resource):
             last_name=data.get('last_name', '')
         )
         user.set_password(data['password'])
-        user.save()
+        try:
+            user.save()
+        except IntegrityError:
+            db.session.rollback()
+            return {'error': 'Username or email already exists'}, 400
 
         return user.to_dict(), 201
 
@@ -164,7 +223,9 @@ class UserDetailV2(Resource):
         """Get user by ID with post count"""
         user = User.query.get_or_404(user_id)
         data = user.to_dict()
-        data['post_count'] = user.posts.count()
+        post_count = bounded_count(user.posts, POST_COUNT_CAP)
+        data['post_count'] = min(post_count, POST_COUNT_CAP)
+        data['post_count_capped'] = post_count > POST_COUNT_CAP
         return data
 
     @jwt_required()
@@ -182,31 +243,38 @@ class UserDetailV2(Resource):
         """
         current_user_id = get_jwt_identity()
         user = User.query.get_or_404(user_id)
-        current_user = User.query.get(current_user_id)
+        current_user = get_current_user()
 
         if current_user_id != user_id and not current_user.is_admin:
             return {'error': 'Unauthorized - can only update own profile'}, 403
 
-        schema = UserUpdateSchema()
         try:
-            data = schema.load(request.get_json())
+            data = user_update_schema.load(request.get_json())
         except ValidationError as err:
             return {'error': 'Validation failed', 'messages': err.messages}, 400
 
+        # Check username/email uniqueness in one query
+        conflict = User.find_conflict(
+            username=data.get('username'),
+            email=data.get('email'),
+            exclude_id=user_id
+        )
+        if conflict:
+            return {
+                'error': 'Validation failed',
+                'messages': {conflict: [f'{conflict.capitalize()} already exists']}
+            }, 400
+
         # Update fields
         for field in ['username', 'email', 'first_name', 'last_name']:
             if field in data:
-                # Check uniqueness for username/email
-                if field in ['username', 'email']:
-                    existing = User.query.filter(
-                        getattr(User, field) == data[field],
-                        User.id != user_id
-                    ).first()
-                    if existing:
-                        return {'error': f'{field} already exists'}, 400
                 setattr(user, field, data[field])
 
-        user.save()
+        try:
+            user.save()
+        except IntegrityError:
+            db.session.rollback()
+            return {'error': 'Username or email already exists'}, 400
         return user.to_dict()
 
     @jwt_required()
@@ -222,7 +290,7 @@ class UserDetailV2(Resource):
         """
         current_user_id = get_jwt_identity()
         user = User.query.get_or_404(user_id)
-        current_user = User.query.get(current_user_id)
+        current_user = get_current_user()
 
         if current_user_id != user_id and not current_user.is_admin:
             return {'error': 'Unauthorized - can only delete own profile'}, 403
@@ -242,7 +310,11 @@ class PostListV2(Resource):
     @api.param('q', 'Search query')
     @api.param('sort', 'Sort field', default='created_at')
     @api.param('order', 'Sort order (asc/desc)', default='desc')
+    @api.param('cursor', 'Cursor from meta.next_cursor (keyset pagination)')
+    @api.param('include_total', 'Include total count with cursor (1)', type='integer')
+    @api.param('exact_count', 'Count exactly on large tables (1)', type='integer')
     @api.param('published', 'Filter by published status')
+    @cached_list('posts', 'users')
     def get(self):
         """
         List all posts with pagination and search
@@ -253,24 +325,31 @@ class PostListV2(Resource):
         - Sorting (sort, order)
         - Filtering by published status
         """
-        query = Post.query
+        # Load authors alongside posts to avoid one SELECT per row
+        query = Post.query.options(with_author_username)
 
         # Build search parameters
-        filters, search_query, sort_field, sort_dir = build_search_params(
-            Post,
-            search_fields=['title', 'content', 'summary']
-        )
+        try:
+            filters, search_query, sort_field, sort_dir = build_search_params(
+                Post,
+                search_fields=Post.__search_fields__
+            )
+        except ValidationError as err:
+            return {'error': 'Validation failed', 'messages': err.messages}, 400
 
         # Apply search, filters, and sorting
-        query = apply_search(query, Post, search_query, ['title', 'content', 'summary'])
+        query = apply_search(query, Post, search_query, Post.__search_fields__)
         query = apply_filters(query, Post, filters)
         query = apply_sorting(query, Post, sort_field, sort_dir)
 
         # Paginate with author info
-        result = paginate_query(query, serializer=lambda p: {
-            **p.to_dict(),
-            'author_username': p.author.username if p.author else None
-        })
+        try:
+            result = paginate_query(query, serializer=lambda p: {
+                **p.to_dict(),
+                'author_username': p.author.username if p.author else None
+            }, sort_column=get_sort_column(Post, sort_field), sort_dir=sort_dir)
+        except ValidationError as err:
+            return {'error': 'Validation failed', 'messages': err.messages}, 400
 
         return result
 
@@ -287,9 +366,8 @@ class PostListV2(Resource):
         """
         current_user_id = get_jwt_identity()
 
-        schema = PostSchema()
         try:
-            data = schema.load(request.get_json())
+            data = post_schema.load(request.get_json())
         except ValidationError as err:
             return {'error': 'Validation failed', 'messages': err.messages}, 400
 
@@ -314,7 +392,7 @@ class PostDetailV2(Resource):
     @api.response(200, 'Success', post_model_v2)
     def get(self, post_id):
         """Get post by ID with author info"""
-        post = Post.query.get_or_404(post_id)
+        post = Post.query.options(with_author_username).get_or_404(post_id)
         data = post.to_dict()
         data['author_username'] = post.author.username if post.author else None
         return data
@@ -337,9 +415,8 @@ class PostDetailV2(Resource):
         if post.user_id != current_user_id:
             return {'error': 'Unauthorized - can only update own posts'}, 403
 
-        schema = PostUpdateSchema()
         try:
-            data = schema.load(request.get_json())
+            data = post_update_schema.load(request.get_json())
         except ValidationError as err:
             return {'error': 'Validation failed', 'messages': err.messages}, 400
 
@@ -389,22 +466,20 @@ class AuthLoginV2(Resource):
         Accepts username or email and password.
         Returns JWT access token on success.
         """
-        schema = LoginSchema()
         try:
-            data = schema.load(request.get_json())
+            data = login_schema.load(request.get_json())
         except ValidationError as err:
             return {'error': 'Validation failed', 'messages': err.messages}, 400
 
-        # Try username first, then email
-        user = User.query.filter_by(username=data['username']).first()
-        if not user:
-            user = User.query.filter_by(email=data['username']).first()
+        user = User.find_by_login(data['username'])
 
-        if not user or not user.check_password(data['password']):
+        # Unknown and inactive accounts still pay one hash check
+        if not user or not user.is_active:
+            User.check_dummy_password(data['password'])
             return {'error': 'Invalid credentials'}, 401
 
-        if not user.is_active:
-            return {'error': 'Account is inactive'}, 401
+        if not user.check_password(data['password']):
+            return {'error': 'Invalid credentials'}, 401
 
         from flask_jwt_extended import create_access_token
         access_token = create_access_token(identity=user.id)
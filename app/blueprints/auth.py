@@ -24,11 +24,9 @@ def register():
         return jsonify({'error': 'Missing required fields'}), 400
     
     # Check existing user
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
+    conflict = User.find_conflict(username=data['username'], email=data['email'])
+    if conflict:
+        return jsonify({'error': f'{conflict.capitalize()} already exists'}), 400
     
     # Create user
     user = User(
@@ -3,7 +3,10 @@ Flask CLI Commands
 """
 import click
 from flask.cli import with_appcontext
+from sqlalchemy import insert
+from app import bcrypt
 from app.models import db
+from app.models.base import bulk_commit
 from app.models.user import User, Post
 
 
@@ -34,24 +37,25 @@ def seed_db():
         click.echo('Admin user created.')
     
     # Create sample posts
-    if Post.query.count() == 0:
-        post1 = Post(
-            title='Welcome to Flask Starter',
-            content='This is your first blog post.',
-            summary='Getting started with Flask',
-            published=True,
-            user_id=admin.id
-        )
-        post1.save()
-        
-        post2 = Post(
-            title='API Documentation',
-            content='Check out the API docs at /api/v1/docs',
-            summary='API Documentation Guide',
-            published=True,
-            user_id=admin.id
-        )
-        post2.save()
+    if not db.session.query(Post.query.exists()).scalar():
+        with bulk_commit(db.session):
+            post1 = Post(
+                title='Welcome to Flask Starter',
+                content='This is your first blog post.',
+                summary='Getting started with Flask',
+                published=True,
+                user_id=admin.id
+            )
+            post1.save(commit=False)
+
+            post2 = Post(
+                title='API Documentation',
+                content='Check out the API docs at /api/v1/docs',
+                summary='API Documentation Guide',
+                published=True,
+                user_id=admin.id
+            )
+            post2.save(commit=False)
         
         click.echo('Sample posts created.')
     
@@ -63,19 +67,26 @@ def seed_db():
 @with_appcontext
 def create_users(count):
     """Create sample users"""
-    from faker import Faker
-    fake = Faker()
-    
-    for _ in range(count):
-        user = User(
-            username=fake.user_name(),
-            email=fake.email(),
-            first_name=fake.first_name(),
-            last_name=fake.last_name()
-        )
-        user.set_password('Password123!')
-        user.save()
-    
+    # Every sample user shares one password, so hash it once and insert
+    # all rows in a single batched statement. With no rows, insert() would
+    # run a single INSERT ... DEFAULT VALUES instead, so skip it
+    if count > 0:
+        from faker import Faker
+        fake = Faker()
+
+        password_hash = bcrypt.generate_password_hash('Password123!').decode('utf-8')
+        db.session.execute(insert(User), [
+            {
+                'username': fake.unique.user_name(),
+                'email': fake.unique.email(),
+                'first_name': fake.first_name(),
+                'last_name': fake.last_name(),
+                'password_hash': password_hash
+            }
+            for _ in range(count)
+        ])
+        db.session.commit()
+
     click.echo(f'{count} users created.')
 
 
@@ -1,8 +1,52 @@
 """
 Base Models with Mixins
 """
+from contextlib import contextmanager
 from datetime import datetime
+from sqlalchemy import DDL, event
 from app.models import db
+from app.models.serialize import build_dumper
+
+# Trigram operator classes come from the pg_trgm extension
+event.listen(
+    db.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
+
+def trigram_indexes(table_name, fields):
+    """
+    Build GIN trigram indexes for substring search (PostgreSQL only)
+
+    Lets PostgreSQL answer ILIKE '%term%' on each named column from an
+    index instead of scanning the table.
+    """
+    return tuple(
+        db.Index(
+            f'{table_name}_{field}_trgm',
+            field,
+            postgresql_using='gin',
+            postgresql_ops={field: 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql')
+        for field in fields
+    )
+
+
+@contextmanager
+def bulk_commit(session):
+    """
+    Commit everything added inside the block in one transaction
+
+    Pair with save(commit=False) when creating several rows at once;
+    the pending rows are rolled back if the block raises.
+    """
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
 
 
 class TimestampMixin:
@@ -23,10 +67,11 @@ class BaseModel(TimestampMixin):
     id = db.Column(db.Integer, primary_key=True)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
-    def save(self):
-        """Save to database"""
+    def save(self, commit=True):
+        """Save to database (commit=False only adds it to the session)"""
         db.session.add(self)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return self
 
     def delete(self):
@@ -36,7 +81,4 @@ class BaseModel(TimestampMixin):
 
     def to_dict(self):
         """Convert model to dictionary"""
-        return {
-            column.name: getattr(self, column.name)
-            for column in self.__table__.columns
-        }
+        return build_dumper(type(self))(self)
@@ -0,0 +1,27 @@
+"""
+Generated Model Serializers
+"""
+import keyword
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def build_dumper(model):
+    """
+    Generate a function that returns a model's column values as a dict
+
+    The column list is resolved once per model and compiled into a dict
+    literal, instead of iterating __table__.columns for every row.
+    """
+    entries = []
+    for column in model.__table__.columns:
+        name = column.name
+        if name.isidentifier() and not keyword.iskeyword(name):
+            entries.append(f'{name!r}: obj.{name}')
+        else:
+            entries.append(f'{name!r}: getattr(obj, {name!r})')
+
+    source = f'def dump(obj):\n    return {{{", ".join(entries)}}}\n'
+    namespace = {}
+    exec(compile(source, f'<dumper {model.__name__}>', 'exec'), namespace)
+    return namespace['dump']
@@ -1,9 +1,17 @@
 """
 User Model
 """
+from functools import lru_cache
+from sqlalchemy import or_
+from app import bcrypt
 from app.models import db
-from app.models.base import BaseModel, TimestampMixin
-from flask_bcrypt import generate_password_hash, check_password_hash
+from app.models.base import BaseModel, TimestampMixin, trigram_indexes
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash():
+    """Hash with the same cost as real passwords, built on first use"""
+    return bcrypt.generate_password_hash('dummy-password').decode('utf-8')
 
 
 class User(BaseModel):
@@ -22,13 +30,67 @@ class User(BaseModel):
     # Relationships
     posts = db.relationship('Post', back_populates='author', lazy='dynamic')
 
+    # Never filterable, searchable, or sortable through the API
+    __private_fields__ = ('password_hash',)
+
+    # Columns the v2 q= search matches, each backed by a trigram index
+    __search_fields__ = ('username', 'email', 'first_name', 'last_name')
+    __table_args__ = trigram_indexes('users', __search_fields__)
+
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password).decode('utf-8')
+        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
 
     def check_password(self, password):
         """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        return bcrypt.check_password_hash(self.password_hash, password)
+
+    @staticmethod
+    def check_dummy_password(password):
+        """
+        Run one hash verification without a user and return False
+
+        Lets failed logins for unknown or inactive accounts cost the same
+        as a wrong password, so response time does not reveal which it was.
+        """
+        bcrypt.check_password_hash(_dummy_password_hash(), password)
+        return False
+
+    @classmethod
+    def find_conflict(cls, username=None, email=None, exclude_id=None):
+        """
+        Return which of username/email is already taken, or None
+
+        Checks both fields in a single query. This is an advisory pre-check;
+        the unique constraints remain the authoritative guard.
+        """
+        conditions = []
+        if username is not None:
+            conditions.append(cls.username == username)
+        if email is not None:
+            conditions.append(cls.email == email)
+        if not conditions:
+            return None
+
+        query = db.session.query(cls.username, cls.email).filter(or_(*conditions))
+        if exclude_id is not None:
+            query = query.filter(cls.id != exclude_id)
+
+        existing = query.first()
+        if existing is None:
+            return None
+        return 'username' if existing.username == username else 'email'
+
+    @classmethod
+    def find_by_login(cls, identifier):
+        """
+        Find a user by username or email in a single query
+
+        A username match takes precedence over an email match.
+        """
+        return cls.query.filter(
+            or_(cls.username == identifier, cls.email == identifier)
+        ).order_by((cls.username == identifier).desc()).first()
 
     def to_dict(self, include_sensitive=False):
         """Convert to dictionary"""
@@ -55,5 +117,9 @@ class Post(BaseModel):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     author = db.relationship('User', back_populates='posts')
 
+    # Columns the v2 q= search matches, each backed by a trigram index
+    __search_fields__ = ('title', 'content', 'summary')
+    __table_args__ = trigram_indexes('posts', __search_fields__)
+
     def __repr__(self):
         return f'<Post {self.title}>'
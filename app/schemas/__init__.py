@@ -1,9 +1,17 @@
 """
 Request/Response Validation Schemas
 """
-from marshmallow import Schema, fields, validate, validates, ValidationError
-from app.models import db
-from app.models.user import User
+from marshmallow import Schema, fields, validate
+
+# Validators are stateless, so create and update schemas share one of each
+USERNAME_LENGTH = validate.Length(min=3, max=80)
+EMAIL_LENGTH = validate.Length(max=120)
+PASSWORD_LENGTH = validate.Length(min=6, max=128)
+NAME_LENGTH = validate.Length(max=50)
+TITLE_LENGTH = validate.Length(min=1, max=200)
+CONTENT_LENGTH = validate.Length(min=1)
+SUMMARY_LENGTH = validate.Length(max=500)
+SORT_ORDER = validate.OneOf(('asc', 'desc'))
 
 
 class BaseSchema(Schema):
@@ -17,25 +25,25 @@ class UserSchema(BaseSchema):
     """User schema for validation"""
     username = fields.Str(
         required=True,
-        validate=validate.Length(min=3, max=80),
+        validate=USERNAME_LENGTH,
         metadata={"description": "Unique username"}
     )
     email = fields.Email(
         required=True,
-        validate=validate.Length(max=120),
+        validate=EMAIL_LENGTH,
         metadata={"description": "User email address"}
     )
     password = fields.Str(
         load_only=True,
-        validate=validate.Length(min=6, max=128),
+        validate=PASSWORD_LENGTH,
         metadata={"description": "User password (write-only)"}
     )
     first_name = fields.Str(
-        validate=validate.Length(max=50),
+        validate=NAME_LENGTH,
         metadata={"description": "User first name"}
     )
     last_name = fields.Str(
-        validate=validate.Length(max=50),
+        validate=NAME_LENGTH,
         metadata={"description": "User last name"}
     )
     is_admin = fields.Bool(
@@ -51,34 +59,20 @@ class UserSchema(BaseSchema):
         metadata={"description": "Last login timestamp"}
     )
 
-    @validates('username')
-    def validate_username(self, value):
-        """Validate username is unique"""
-        user = User.query.filter_by(username=value).first()
-        if user:
-            raise ValidationError('Username already exists')
-
-    @validates('email')
-    def validate_email(self, value):
-        """Validate email is unique"""
-        user = User.query.filter_by(email=value).first()
-        if user:
-            raise ValidationError('Email already exists')
-
 
 class UserUpdateSchema(Schema):
     """User update schema (all fields optional)"""
     username = fields.Str(
-        validate=validate.Length(min=3, max=80)
+        validate=USERNAME_LENGTH
     )
     email = fields.Email(
-        validate=validate.Length(max=120)
+        validate=EMAIL_LENGTH
     )
     first_name = fields.Str(
-        validate=validate.Length(max=50)
+        validate=NAME_LENGTH
     )
     last_name = fields.Str(
-        validate=validate.Length(max=50)
+        validate=NAME_LENGTH
     )
 
 
@@ -86,16 +80,16 @@ class PostSchema(BaseSchema):
     """Post schema for validation"""
     title = fields.Str(
         required=True,
-        validate=validate.Length(min=1, max=200),
+        validate=TITLE_LENGTH,
         metadata={"description": "Post title"}
     )
     content = fields.Str(
         required=True,
-        validate=validate.Length(min=1),
+        validate=CONTENT_LENGTH,
         metadata={"description": "Post content"}
     )
     summary = fields.Str(
-        validate=validate.Length(max=500),
+        validate=SUMMARY_LENGTH,
         metadata={"description": "Post summary"}
     )
     published = fields.Bool(
@@ -111,13 +105,13 @@ class PostSchema(BaseSchema):
 class PostUpdateSchema(Schema):
     """Post update schema (all fields optional)"""
     title = fields.Str(
-        validate=validate.Length(min=1, max=200)
+        validate=TITLE_LENGTH
     )
     content = fields.Str(
-        validate=validate.Length(min=1)
+        validate=CONTENT_LENGTH
     )
     summary = fields.Str(
-        validate=validate.Length(max=500)
+        validate=SUMMARY_LENGTH
     )
     published = fields.Bool()
 
@@ -161,7 +155,7 @@ class PaginationSchema(Schema):
     )
     order = fields.Str(
         missing='desc',
-        validate=validate.OneOf(['asc', 'desc']),
+        validate=SORT_ORDER,
         metadata={"description": "Sort order (asc or desc)"}
     )
 
@@ -0,0 +1,104 @@
+"""
+Response caching for read-heavy list endpoints
+"""
+import logging
+from functools import wraps
+from urllib.parse import urlencode
+from uuid import uuid4
+from flask import request
+from sqlalchemy import event
+from app import cache
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+
+def _generation_key(table):
+    return f'generation:{table}'
+
+
+def cached_list(*tables, timeout=None):
+    """
+    Cache a list endpoint's response by path and query string
+
+    Each key embeds a generation token for every table the response
+    reads from. Commits that write to one of those tables replace its
+    token, so a cached page is never served after a write. This relies on
+    a backend shared by every worker (Redis); without REDIS_URL the app
+    uses NullCache and nothing is cached. If the cache backend fails, the
+    request is served uncached.
+
+    Args:
+        tables: Names of the tables the response is built from
+        timeout: Seconds to keep a page (default: CACHE_DEFAULT_TIMEOUT)
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                generations = cache.get_many(*[_generation_key(table) for table in tables])
+                query_string = urlencode(sorted(request.args.items(multi=True)))
+                key = 'list:{}?{}:{}'.format(
+                    request.path, query_string,
+                    ':'.join(generation or '0' for generation in generations)
+                )
+                result = cache.get(key)
+            except Exception:
+                logger.warning('Response cache unavailable, serving uncached', exc_info=True)
+                return f(*args, **kwargs)
+
+            if result is None:
+                result = f(*args, **kwargs)
+                # Error responses come back as (body, status) tuples
+                if not isinstance(result, tuple):
+                    try:
+                        cache.set(key, result, timeout=timeout)
+                    except Exception:
+                        logger.warning('Could not store %s in the response cache', key,
+                                       exc_info=True)
+
+            return result
+        return decorated_function
+    return decorator
+
+
+def _written_tables(session):
+    return session.info.setdefault('written_tables', set())
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_flushed_tables(session, flush_context):
+    """Remember which tables the unit of work wrote to"""
+    written = _written_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, '__table__', None)
+        if table is not None:
+            written.add(table.name)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _record_executed_tables(orm_execute_state):
+    """Remember tables written by insert()/update()/delete() and bulk Query DML"""
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        _written_tables(state.session).add(state.statement.table.name)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_written_tables(session):
+    """
+    Move cached list pages for written tables to a new generation
+
+    The commit has already happened, so a cache outage is logged rather
+    than raised; pages cached before it expire after their timeout.
+    """
+    for table in session.info.pop('written_tables', ()):
+        try:
+            cache.set(_generation_key(table), uuid4().hex, timeout=0)
+        except Exception:
+            logger.warning('Could not invalidate cached %s pages', table, exc_info=True)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_written_tables(session):
+    session.info.pop('written_tables', None)
@@ -3,7 +3,8 @@ Custom Decorators
 """
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import verify_jwt_in_request
+from app.utils.helpers import get_current_user
 
 
 def admin_required(f):
@@ -11,10 +12,7 @@ def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        
-        from app.models.user import User
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or not user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
@@ -1,7 +1,8 @@
 """
 Helper Functions
 """
-from flask import jsonify, make_response
+from flask import g, jsonify, make_response
+from flask_jwt_extended import get_jwt_identity
 
 
 def success_response(data=None, message=None, status=200):
@@ -46,3 +47,18 @@ def paginate_response(query, page=1, per_page=10):
         'has_next': pagination.has_next,
         'has_prev': pagination.has_prev
     }
+
+
+def get_current_user():
+    """Return the user for the current JWT, loaded at most once per identity"""
+    identity = get_jwt_identity()
+
+    # g can outlive a request when an app context is already pushed, so
+    # remember whose user was cached and reload for a different token
+    cached = g.get('_current_user')
+    if cached is None or cached[0] != identity:
+        from app.models import db
+        from app.models.user import User
+        cached = g._current_user = (identity, db.session.get(User, identity))
+
+    return cached[1]
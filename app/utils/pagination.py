@@ -1,15 +1,65 @@
 """
 Pagination utility for API endpoints
 """
+import base64
+import json
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence
 from flask import request, jsonify
-from sqlalchemy import or_
+from marshmallow import ValidationError
+from sqlalchemy import ColumnElement, bindparam, func, literal_column, or_, text, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
 from app.models import db
 
 
+# Query parameters consumed by pagination, search, and sorting (never filters)
+RESERVED_PARAMS = frozenset({
+    'page', 'per_page', 'q', 'sort', 'order', 'cursor', 'include_total',
+    'exact_count'
+})
+
+# Tables above this many rows get planner-estimated totals on PostgreSQL
+ESTIMATE_THRESHOLD = 100_000
+
+# Seconds a table's pg_class row estimate is reused
+ESTIMATE_TTL = 60
+
+_row_estimates: dict[str, tuple[float, int]] = {}
+
+CURSOR_INVALID = 'Invalid cursor.'
+CURSOR_MISMATCH = 'Cursor does not match the requested sort and order.'
+
+
+# A mapped model class, and a function applied to each row of a page
+Model = Any
+Serializer = Optional[Callable[[Any], Any]]
+
+# request.args is a MultiDict, a dict subclass whose get() returns the first
+# value; left as Any so mypyc calls that method instead of its dict fast path
+RequestArgs = Any
+
+
 class Pagination:
     """Pagination helper class"""
 
-    def __init__(self, query, page=None, per_page=None, max_per_page=100):
+    # Annotated so the mypyc build stores these as native attributes
+    query: Query
+    page: int
+    per_page: int
+    max_per_page: int
+    sort_column: Optional[InstrumentedAttribute]
+    id_column: InstrumentedAttribute
+    sort_dir: str
+    cursor: Optional[tuple[Any, int]]
+    include_total: bool
+    exact_count: bool
+
+    def __init__(self, query: Query, page: Optional[int] = None,
+                 per_page: Optional[int] = None, max_per_page: int = 100,
+                 sort_column: Optional[InstrumentedAttribute] = None,
+                 sort_dir: str = 'desc') -> None:
         """
         Initialize pagination
 
@@ -18,11 +68,37 @@ class Pagination:
             page: Page number (default: from request args)
             per_page: Items per page (default: from request args)
             max_per_page: Maximum items per page (default: 100)
+            sort_column: Column the query is ordered by; enables cursor
+                (keyset) pagination when it is non-nullable
+            sort_dir: Sort direction of sort_column ('asc' or 'desc')
+
+        Raises:
+            ValidationError: if the cursor is malformed or was issued for a
+                different sort field or direction
         """
+        args: RequestArgs = request.args
         self.query = query
-        self.page = page or request.args.get('page', 1, type=int)
-        self.per_page = per_page or request.args.get('per_page', 20, type=int)
+        self.page = page or args.get('page', 1, type=int)
+        self.per_page = per_page or args.get('per_page', 20, type=int)
         self.max_per_page = max_per_page
+        self.sort_column = None
+        self.sort_dir = 'asc' if sort_dir == 'asc' else 'desc'
+        self.cursor = None
+        self.include_total = args.get('include_total', 0, type=int) == 1
+        self.exact_count = args.get('exact_count', 0, type=int) == 1
+
+        # Keyset pagination needs a total order, so break ties on the primary key
+        if sort_column is not None and not sort_column.property.columns[0].nullable:
+            self.sort_column = sort_column
+            self.id_column = sort_column.class_.id
+            if self.sort_dir == 'asc':
+                self.query = self.query.order_by(self.id_column.asc())
+            else:
+                self.query = self.query.order_by(self.id_column.desc())
+            self.cursor = self._decode_cursor(args.get('cursor'))
+        elif sort_column is not None and args.get('cursor'):
+            # Cursors are only issued for non-nullable sort columns
+            raise ValidationError({'cursor': [CURSOR_MISMATCH]})
 
         # Validate and limit per_page
         if self.per_page < 1:
@@ -34,25 +110,159 @@ class Pagination:
         if self.page < 1:
             self.page = 1
 
-    def paginate(self):
+    def _encode_cursor(self, item: Any) -> str:
+        """Build an opaque cursor from the sort order and the item's position in it"""
+        sort_column = self.sort_column
+        assert sort_column is not None, 'cursors need a keyset sort column'
+        model = sort_column.class_
+        entity = item if isinstance(item, model) else item._mapping[model]
+        value = getattr(entity, sort_column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        payload = json.dumps(
+            [sort_column.key, self.sort_dir, value, entity.id]
+        ).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def _decode_cursor(self, cursor: Optional[str]) -> Optional[tuple[Any, int]]:
+        """
+        Parse a cursor into (sort value, id); None if missing
+
+        Raises:
+            ValidationError: if the cursor is malformed or does not match
+                the requested sort field and direction
+        """
+        sort_column = self.sort_column
+        assert sort_column is not None, 'cursors need a keyset sort column'
+        if not cursor:
+            return None
+        try:
+            sort_key, sort_dir, value, last_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            python_type = sort_column.type.python_type
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            # Only values of the column's own type reach the comparison
+            # (bool is an int subclass, so compare types exactly)
+            if type(value) is not python_type or type(last_id) is not int:
+                raise TypeError('cursor value does not match the sort column')
+        except (ValueError, TypeError, NotImplementedError):
+            raise ValidationError({'cursor': [CURSOR_INVALID]})
+
+        if (sort_key, sort_dir) != (sort_column.key, self.sort_dir):
+            raise ValidationError({'cursor': [CURSOR_MISMATCH]})
+
+        return value, last_id
+
+    def _count(self) -> tuple[int, bool]:
+        """
+        Count the rows matched by the query
+
+        On PostgreSQL, COUNT(*) scans every matching row, so for tables
+        above ESTIMATE_THRESHOLD rows the planner's estimate is used
+        instead unless exact_count=1 was requested.
+
+        Returns:
+            tuple of (total, whether total is an estimate)
+        """
+        if not self.exact_count and db.engine.dialect.name == 'postgresql':
+            entity: Model = self.query.column_descriptions[0]['entity']
+            table = entity.__table__
+            if _row_estimate(table.name) > ESTIMATE_THRESHOLD:
+                return _planned_rows(self.query), True
+
+        return self.query.count(), False
+
+    def _collect(self, query: Query,
+                 serializer: Serializer = None) -> tuple[list[Any], Any, bool]:
+        """
+        Fetch up to per_page rows, serializing each as it is iterated
+
+        A page is at most max_per_page + 1 rows, so it is read in one fetch;
+        server-side cursors would only add round trips.
+
+        Returns:
+            tuple of (items, last raw row, whether more rows were fetched)
+        """
+        items: list[Any] = []
+        last = None
+        has_more = False
+        for row in query:
+            if len(items) == self.per_page:
+                has_more = True
+                continue
+            items.append(serializer(row) if serializer else row)
+            last = row
+
+        return items, last, has_more
+
+    def paginate_keyset(self, serializer: Serializer = None) -> dict[str, Any]:
+        """
+        Execute keyset (seek) pagination query
+
+        Fetches the rows after the cursor instead of skipping OFFSET rows,
+        so every page costs the same. The total count is only computed
+        when requested with include_total=1.
+
+        Args:
+            serializer: Optional function applied to each item as fetched
+
+        Returns:
+            dict with items, pagination metadata
+        """
+        key = tuple_(self.sort_column, self.id_column)
+        if self.sort_dir == 'asc':
+            query = self.query.filter(key > self.cursor)
+        else:
+            query = self.query.filter(key < self.cursor)
+
+        # Fetch one extra row to know whether another page exists
+        items, last, has_next = self._collect(query.limit(self.per_page + 1), serializer)
+
+        pagination = {
+            'per_page': self.per_page,
+            'has_next': has_next,
+            'next_cursor': self._encode_cursor(last) if has_next else None
+        }
+        if self.include_total:
+            pagination['total'], _ = self._count()
+
+        return {
+            'items': items,
+            'pagination': pagination
+        }
+
+    def paginate(self, serializer: Serializer = None) -> dict[str, Any]:
         """
         Execute pagination query
 
+        Args:
+            serializer: Optional function applied to each item as fetched
+
         Returns:
             dict with items, pagination metadata
         """
-        # Get total count
-        total = self.query.count()
+        if self.cursor is not None:
+            return self.paginate_keyset(serializer=serializer)
+
+        # Get total count (estimated on large PostgreSQL tables)
+        total, estimated = self._count()
 
         # Calculate pagination
         total_pages = (total + self.per_page - 1) // self.per_page
 
-        # Validate page number
-        if self.page > total_pages and total_pages > 0:
+        # Validate page number (an estimate may be short, so never clamp to it)
+        if not estimated and self.page > total_pages and total_pages > 0:
             self.page = total_pages
 
-        # Get items
-        items = self.query.offset((self.page - 1) * self.per_page).limit(self.per_page).all()
+        # Get items, plus one extra row to know whether another page exists
+        page_query = self.query.offset((self.page - 1) * self.per_page).limit(self.per_page + 1)
+        items, last, has_next = self._collect(page_query, serializer)
+
+        next_cursor = None
+        if has_next and last is not None and self.sort_column is not None:
+            next_cursor = self._encode_cursor(last)
 
         return {
             'items': items,
@@ -61,14 +271,15 @@ class Pagination:
                 'per_page': self.per_page,
                 'total': total,
                 'total_pages': total_pages,
-                'has_next': self.page < total_pages,
+                'has_next': has_next,
                 'has_prev': self.page > 1,
-                'next_page': self.page + 1 if self.page < total_pages else None,
-                'prev_page': self.page - 1 if self.page > 1 else None
+                'next_page': self.page + 1 if has_next else None,
+                'prev_page': self.page - 1 if self.page > 1 else None,
+                'next_cursor': next_cursor
             }
         }
 
-    def to_dict(self, serializer=None):
+    def to_dict(self, serializer: Serializer = None) -> dict[str, Any]:
         """
         Convert paginated results to dictionary
 
@@ -78,20 +289,17 @@ class Pagination:
         Returns:
             dict with items and pagination info
         """
-        result = self.paginate()
-
-        if serializer:
-            items = [serializer(item) for item in result['items']]
-        else:
-            items = [item.to_dict() for item in result['items']]
+        result = self.paginate(serializer=serializer or (lambda item: item.to_dict()))
 
         return {
-            'data': items,
+            'data': result['items'],
             'meta': result['pagination']
         }
 
 
-def paginate_query(query, serializer=None, max_per_page=100):
+def paginate_query(query: Query, serializer: Serializer = None, max_per_page: int = 100,
+                   sort_column: Optional[InstrumentedAttribute] = None,
+                   sort_dir: str = 'desc') -> dict[str, Any]:
     """
     Convenience function to paginate a query
 
@@ -99,15 +307,39 @@ def paginate_query(query, serializer=None, max_per_page=100):
         query: SQLAlchemy query object
         serializer: Optional serializer function
         max_per_page: Maximum items per page
+        sort_column: Column the query is ordered by (enables cursor pagination)
+        sort_dir: Sort direction of sort_column
 
     Returns:
         dict with items and pagination metadata
+
+    Raises:
+        ValidationError: if the cursor is invalid for this sort
     """
-    pagination = Pagination(query, max_per_page=max_per_page)
+    pagination = Pagination(query, max_per_page=max_per_page,
+                            sort_column=sort_column, sort_dir=sort_dir)
     return pagination.to_dict(serializer=serializer)
 
 
-def build_search_params(model, search_fields=None):
+def bounded_count(query: Query, cap: int) -> int:
+    """
+    Count a query's rows, stopping once more than cap are found
+
+    Args:
+        query: SQLAlchemy query
+        cap: Largest count that needs to be exact
+
+    Returns:
+        Row count, at most cap + 1 (any value above cap means "more than cap")
+    """
+    rows = query.with_entities(literal_column('1')).order_by(None)
+    subquery = rows.limit(cap + 1).subquery()
+    return db.session.query(func.count()).select_from(subquery).scalar()
+
+
+def build_search_params(
+    model: Model, search_fields: Optional[Sequence[str]] = None
+) -> tuple[dict[str, str], str, str, str]:
     """
     Build search parameters from request args
 
@@ -117,22 +349,90 @@ def build_search_params(model, search_fields=None):
 
     Returns:
         tuple of (filters dict, search query, sort field, sort direction)
+
+    Raises:
+        ValidationError: if a filter names an unknown field
     """
-    filters = {}
-    search_query = request.args.get('q', '').strip()
-    sort_field = request.args.get('sort', 'created_at')
-    sort_dir = request.args.get('order', 'desc')
+    args: RequestArgs = request.args
+    search_query = args.get('q', '').strip()
+    sort_field = args.get('sort', 'created_at')
+    sort_dir = args.get('order', 'desc')
+    model_fields = _model_fields(model)
 
     # Build filters from request args
-    for key, value in request.args.items():
-        if key not in ['page', 'per_page', 'q', 'sort', 'order']:
-            if hasattr(model, key):
-                filters[key] = value
+    params = args.to_dict()
+    filters = {
+        key: value for key, value in params.items()
+        if key not in RESERVED_PARAMS and key in model_fields
+    }
+    unknown = {
+        key: ['Unknown field.'] for key in params
+        if key not in RESERVED_PARAMS and key not in model_fields
+    }
+
+    if unknown:
+        raise ValidationError(unknown)
 
     return filters, search_query, sort_field, sort_dir
 
 
-def apply_filters(query, model, filters):
+def _row_estimate(table_name: str) -> int:
+    """Approximate row count of a PostgreSQL table, cached for ESTIMATE_TTL"""
+    now = time.monotonic()
+    cached = _row_estimates.get(table_name)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    estimate = db.session.execute(
+        text('SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name'),
+        {'table_name': table_name}
+    ).scalar() or 0
+    _row_estimates[table_name] = (now + ESTIMATE_TTL, estimate)
+    return estimate
+
+
+def _planned_rows(query: Query) -> int:
+    """Number of rows the PostgreSQL planner expects a query to return"""
+    connection = query.session.connection()
+    compiled = query.statement.compile(
+        dialect=connection.dialect,
+        compile_kwargs={'render_postcompile': True}
+    )
+    plan = connection.exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+@lru_cache(maxsize=None)
+def _model_fields(model: Model) -> frozenset[str]:
+    """Column names a model can be filtered, searched, or sorted by"""
+    private = getattr(model, '__private_fields__', ())
+    return frozenset(model.__table__.columns.keys()) - frozenset(private)
+
+
+@lru_cache(maxsize=32)
+def _search_condition(
+    model: Model, search_fields: tuple[str, ...]
+) -> Optional[ColumnElement[bool]]:
+    """
+    Build the search condition once per model and field set
+
+    The search text is bound per request through the :search_term
+    parameter, so only its value changes between requests.
+    """
+    model_fields = _model_fields(model)
+    columns = [getattr(model, field) for field in search_fields if field in model_fields]
+    if not columns:
+        return None
+
+    return or_(*(column.ilike(bindparam('search_term')) for column in columns))
+
+
+def apply_filters(query: Query, model: Model, filters: dict[str, str]) -> Query:
     """
     Apply filters to query
 
@@ -144,16 +444,21 @@ def apply_filters(query, model, filters):
     Returns:
         Filtered query
     """
+    model_fields = _model_fields(model)
     for field, value in filters.items():
-        if hasattr(model, field):
+        if field in model_fields:
             query = query.filter(getattr(model, field) == value)
 
     return query
 
 
-def apply_search(query, model, search_query, search_fields):
+def apply_search(query: Query, model: Model, search_query: str,
+                 search_fields: Sequence[str]) -> Query:
     """
-    Apply full-text search to query
+    Apply substring search to query
+
+    On PostgreSQL, the ILIKE on each of a model's __search_fields__ is
+    backed by a trigram index.
 
     Args:
         query: SQLAlchemy query
@@ -167,20 +472,32 @@ def apply_search(query, model, search_query, search_fields):
     if not search_query or not search_fields:
         return query
 
-    search_conditions = []
-    for field in search_fields:
-        if hasattr(model, field):
-            search_conditions.append(
-                getattr(model, field).ilike(f'%{search_query}%')
-            )
+    condition = _search_condition(model, tuple(search_fields))
+    if condition is None:
+        return query
 
-    if search_conditions:
-        return query.filter(or_(*search_conditions))
+    return query.filter(condition).params(search_term=f'%{search_query}%')
 
-    return query
+
+def get_sort_column(model: Model, sort_field: str) -> InstrumentedAttribute:
+    """
+    Resolve the column to sort by
+
+    Args:
+        model: Model class
+        sort_field: Field name to sort by
+
+    Returns:
+        Model column, falling back to created_at for unknown fields
+    """
+    if sort_field not in _model_fields(model):
+        sort_field = 'created_at'
+
+    return getattr(model, sort_field)
 
 
-def apply_sorting(query, model, sort_field, sort_dir):
+def apply_sorting(query: Query, model: Model, sort_field: str,
+                  sort_dir: str) -> Query:
     """
     Apply sorting to query
 
@@ -193,10 +510,7 @@ def apply_sorting(query, model, sort_field, sort_dir):
     Returns:
         Sorted query
     """
-    if not hasattr(model, sort_field):
-        sort_field = 'created_at'
-
-    sort_column = getattr(model, sort_field)
+    sort_column = get_sort_column(model, sort_field)
 
     if sort_dir == 'asc':
         return query.order_by(sort_column.asc())
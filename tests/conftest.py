@@ -2,70 +2,186 @@
 Pytest Configuration and Fixtures
 """
 import pytest
-import sys
 import os
+import sys
+from functools import lru_cache
 from pathlib import Path
 
-# Add parent directory to path to import app.py correctly
+# Add parent directory to path to import the app package
 parent_dir = str(Path(__file__).parent.parent)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-# Import from app.py module (not app package)
-import importlib.util
-spec = importlib.util.spec_from_file_location("app_module", os.path.join(parent_dir, "app.py"))
-app_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(app_module)
-
-create_app = app_module.create_app
+# Import the factory from the package; app.py would also build a
+# development app backed by the on-disk sqlite:///app.db
+from app import create_app
 
 # Import models from app package
+from flask_caching.backends import SimpleCache
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, event, make_url, text
+from app import cache
 from app.models import db
 from app.models.user import User
+from tests.utils import password_hash
 
 
-@pytest.fixture
+def use_worker_database():
+    """Point each pytest-xdist worker at its own TEST_DATABASE_URL database
+
+    In-memory SQLite is already private to each worker process; file and
+    server databases get the worker id appended to their name, and missing
+    PostgreSQL databases are created.
+    """
+    url = os.getenv('TEST_DATABASE_URL')
+    worker = os.getenv('PYTEST_XDIST_WORKER')
+    if not url or not worker:
+        return
+
+    url = make_url(url)
+    if url.database in (None, '', ':memory:'):
+        return
+
+    root, extension = os.path.splitext(url.database)
+    name = f'{root}_{worker}{extension}'
+
+    if url.get_backend_name() == 'postgresql':
+        engine = create_engine(url, isolation_level='AUTOCOMMIT')
+        with engine.connect() as connection:
+            exists = connection.scalar(
+                text('SELECT 1 FROM pg_database WHERE datname = :name'),
+                {'name': name}
+            )
+            if not exists:
+                connection.exec_driver_sql(f'CREATE DATABASE "{name}"')
+        engine.dispose()
+
+    os.environ['TEST_DATABASE_URL'] = url.set(database=name).render_as_string(
+        hide_password=False
+    )
+
+
+@lru_cache(maxsize=None)
+def build_app(config_name):
+    """Create the application once per configuration"""
+    return create_app(config_name)
+
+
+@pytest.fixture(scope='session')
 def app():
-    """Create application for testing"""
-    app = create_app('testing')
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    
+    """Create application and schema once for the test session"""
+    use_worker_database()
+    app = build_app('testing')
+
     with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            # Let pysqlite emit BEGIN/SAVEPOINT as SQLAlchemy asks
+            @event.listens_for(db.engine, 'connect')
+            def disable_pysqlite_transactions(dbapi_connection, connection_record):
+                dbapi_connection.isolation_level = None
+
+            @event.listens_for(db.engine, 'begin')
+            def emit_begin(connection):
+                connection.exec_driver_sql('BEGIN')
+
+        # Sessions joining a test's transaction commit to a SAVEPOINT
+        db.session.configure(join_transaction_mode='create_savepoint')
         db.create_all()
-        yield app
+
+    yield app
+
+    with app.app_context():
         db.drop_all()
 
 
+@pytest.fixture(scope='class')
+def db_connection(app):
+    """Hold one transaction open for a test class and roll it back afterwards
+
+    The default bind is swapped for a connection with an open transaction,
+    so commits by the code under test only release a SAVEPOINT and every
+    class starts from empty tables without rebuilding the schema.
+    """
+    with app.app_context():
+        engines = db.engines
+        engine = engines[None]
+        connection = engine.connect()
+        transaction = connection.begin()
+        engines[None] = connection
+
+    yield connection
+
+    engines[None] = engine
+    transaction.rollback()
+    connection.close()
+
+
 @pytest.fixture
-def client(app):
+def db_session(app, db_connection):
+    """Run the test inside a SAVEPOINT that is rolled back afterwards
+
+    Rows committed by class-scoped fixtures stay visible; rows written by
+    the test do not outlive it. Each test gets its own application context,
+    so g and the scoped session do not outlive it either.
+    """
+    with app.app_context():
+        savepoint = db_connection.begin_nested()
+
+        yield db.session
+
+        db.session.remove()
+        savepoint.rollback()
+
+
+def _create_shared_user(app, username, email):
+    """Commit a user for the rest of the test class and return it detached"""
+    with app.app_context():
+        user = User(username=username, email=email,
+                    password_hash=password_hash('password123'))
+        user.save()
+        db.session.refresh(user)
+        db.session.remove()
+    return user
+
+
+@pytest.fixture(scope='class')
+def shared_user(app, db_connection):
+    """User 'testuser' (password123), created once per test class"""
+    return _create_shared_user(app, 'testuser', 'test@example.com')
+
+
+@pytest.fixture(scope='class')
+def shared_user2(app, db_connection):
+    """User 'user2' (password123), created once per test class"""
+    return _create_shared_user(app, 'user2', 'user2@example.com')
+
+
+@pytest.fixture
+def response_cache(app, monkeypatch):
+    """Stand in for a shared Redis cache with an in-memory one for one test"""
+    backend = SimpleCache(default_timeout=30)
+    monkeypatch.setitem(app.extensions['cache'], cache, backend)
+    return backend
+
+
+@pytest.fixture
+def client(app, db_session):
     """Create test client"""
     return app.test_client()
 
 
 @pytest.fixture
-def runner(app):
+def runner(app, db_session):
     """Create test CLI runner"""
     return app.test_cli_runner()
 
 
-@pytest.fixture
-def auth_headers(client):
-    """Create authenticated user and return headers"""
-    # Register user
-    client.post('/api/v1/auth/register', json={
-        'username': 'testuser',
-        'email': 'test@example.com',
-        'password': 'TestPass123!'
-    })
-    
-    # Login
-    response = client.post('/api/v1/auth/login', json={
-        'username': 'testuser',
-        'password': 'TestPass123!'
-    })
-    
-    token = response.json['access_token']
+@pytest.fixture(scope='class')
+def auth_headers(app, shared_user):
+    """Return headers with a token for shared_user, signed once per class"""
+    with app.app_context():
+        token = create_access_token(identity=shared_user.id)
+
     return {'Authorization': f'Bearer {token}'}
 
 
@@ -1,10 +1,15 @@
 """
 Tests for API V2 endpoints
 """
+import base64
 import pytest
 from flask import json
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 from app.models import db
+from app.models.base import bulk_commit
 from app.models.user import User, Post
+from tests.utils import bulk_create_users, bulk_create_posts, post_json
 
 
 class TestUsersV2:
@@ -13,13 +18,7 @@ class TestUsersV2:
     def test_list_users_pagination(self, client):
         """Test user list with pagination"""
         # Create test users
-        for i in range(25):
-            user = User(
-                username=f'testuser{i}',
-                email=f'test{i}@example.com'
-            )
-            user.set_password('password123')
-            user.save()
+        bulk_create_users(25)
 
         response = client.get('/api/v2/users/?page=1&per_page=10')
         assert response.status_code == 200
@@ -32,13 +31,14 @@ class TestUsersV2:
 
     def test_search_users(self, client):
         """Test user search functionality"""
-        user1 = User(username='john_doe', email='john@example.com')
-        user1.set_password('password123')
-        user1.save()
+        with bulk_commit(db.session):
+            user1 = User(username='john_doe', email='john@example.com')
+            user1.set_password('password123')
+            user1.save(commit=False)
 
-        user2 = User(username='jane_doe', email='jane@example.com')
-        user2.set_password('password123')
-        user2.save()
+            user2 = User(username='jane_doe', email='jane@example.com')
+            user2.set_password('password123')
+            user2.save(commit=False)
 
         response = client.get('/api/v2/users/?q=john')
         assert response.status_code == 200
@@ -46,24 +46,58 @@ class TestUsersV2:
         assert len(data['data']) == 1
         assert data['data'][0]['username'] == 'john_doe'
 
-    def test_create_user_validation(self, client):
-        """Test user creation with validation"""
-        # Test missing fields
-        response = client.post('/api/v2/users/',
-                              json={'username': 'test'},
-                              content_type='application/json')
+    def test_post_count_capped(self, client, shared_user2):
+        """Test post counts above the cap are reported as capped"""
+        bulk_create_posts(101, shared_user2.id)
+
+        response = client.get(f'/api/v2/users/{shared_user2.id}')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['post_count'] == 100
+        assert data['post_count_capped'] is True
+
+        response = client.get('/api/v2/users/?username=user2')
+        assert response.status_code == 200
+        data = response.get_json()['data'][0]
+        assert data['post_count'] == 100
+        assert data['post_count_capped'] is True
+
+    def test_post_count_exact_below_cap(self, client, shared_user2):
+        """Test post counts at or below the cap are exact"""
+        bulk_create_posts(100, shared_user2.id)
+
+        data = client.get(f'/api/v2/users/{shared_user2.id}').get_json()
+        assert data['post_count'] == 100
+        assert data['post_count_capped'] is False
+
+        data = client.get('/api/v2/users/?username=user2').get_json()['data'][0]
+        assert data['post_count'] == 100
+        assert data['post_count_capped'] is False
+
+    @pytest.mark.parametrize('params, field', [
+        ({'bogus': '1'}, 'bogus'),
+        ({'password_hash': 'x'}, 'password_hash'),
+    ], ids=['unknown_field', 'private_field'])
+    def test_list_users_rejects_filter(self, client, params, field):
+        """Test filtering on unknown or private fields is rejected"""
+        response = client.get('/api/v2/users/', query_string=params)
         assert response.status_code == 400
+        assert response.get_json()['messages'] == {field: ['Unknown field.']}
 
-        # Test valid creation
-        response = client.post('/api/v2/users/',
-                              json={
-                                  'username': 'testuser',
-                                  'email': 'test@example.com',
-                                  'password': 'password123',
-                                  'first_name': 'Test',
-                                  'last_name': 'User'
-                              },
-                              content_type='application/json')
+    def test_create_user_missing_fields(self, client):
+        """Test user creation rejects missing fields"""
+        response = post_json(client, '/api/v2/users/', {'username': 'test'})
+        assert response.status_code == 400
+
+    def test_create_user_valid(self, client):
+        """Test valid user creation"""
+        response = post_json(client, '/api/v2/users/', {
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'password': 'password123',
+            'first_name': 'Test',
+            'last_name': 'User'
+        })
         assert response.status_code == 201
         data = response.get_json()
         assert data['username'] == 'testuser'
@@ -76,22 +110,63 @@ class TestUsersV2:
         user.set_password('password123')
         user.save()
 
-        response = client.post('/api/v2/users/',
-                              json={
-                                  'username': 'testuser',
-                                  'email': 'test2@example.com',
-                                  'password': 'password123'
-                              },
-                              content_type='application/json')
+        response = post_json(client, '/api/v2/users/', {
+            'username': 'testuser',
+            'email': 'test2@example.com',
+            'password': 'password123'
+        })
+        assert response.status_code == 400
+        assert response.get_json()['messages'] == {'username': ['Username already exists']}
+
+    def test_duplicate_email_validation(self, client, shared_user):
+        """Test duplicate email validation"""
+        response = post_json(client, '/api/v2/users/', {
+            'username': 'newuser',
+            'email': 'test@example.com',
+            'password': 'password123'
+        })
+        assert response.status_code == 400
+        assert response.get_json()['messages'] == {'email': ['Email already exists']}
+
+    @pytest.mark.parametrize('field, value', [
+        ('username', 'user2'),
+        ('email', 'user2@example.com'),
+    ])
+    def test_update_user_conflict(self, client, shared_user, shared_user2,
+                                  auth_headers, field, value):
+        """Test updating to another user's username or email"""
+        response = client.put(f'/api/v2/users/{shared_user.id}',
+                             json={field: value},
+                             headers=auth_headers)
         assert response.status_code == 400
+        assert response.get_json()['messages'] == {
+            field: [f'{field.capitalize()} already exists']
+        }
+
+    def test_current_user_follows_token(self, client, shared_user, shared_user2):
+        """Test each request resolves the user of its own token"""
+        admin = User(username='admin', email='admin@example.com', is_admin=True)
+        admin.set_password('password123')
+        admin.save()
+
+        admin_headers = {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+        response = client.put(f'/api/v2/users/{shared_user.id}',
+                             json={'first_name': 'Updated'},
+                             headers=admin_headers)
+        assert response.status_code == 200
 
-    def test_update_user_with_auth(self, client, auth_headers):
-        """Test user update with authentication"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
+        # A non-admin must not inherit the admin loaded by the previous request
+        other_headers = {
+            'Authorization': f'Bearer {create_access_token(identity=shared_user2.id)}'
+        }
+        response = client.put(f'/api/v2/users/{shared_user.id}',
+                             json={'first_name': 'Hijacked'},
+                             headers=other_headers)
+        assert response.status_code == 403
 
-        response = client.put(f'/api/v2/users/{user.id}',
+    def test_update_user_with_auth(self, client, shared_user, auth_headers):
+        """Test user update with authentication"""
+        response = client.put(f'/api/v2/users/{shared_user.id}',
                              json={'first_name': 'Updated'},
                              headers=auth_headers)
         assert response.status_code == 200
@@ -102,22 +177,10 @@ class TestUsersV2:
 class TestPostsV2:
     """Test post endpoints V2"""
 
-    def test_list_posts_pagination(self, client):
+    def test_list_posts_pagination(self, client, shared_user):
         """Test post list with pagination"""
-        # Create test user
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
-
         # Create test posts
-        for i in range(15):
-            post = Post(
-                title=f'Test Post {i}',
-                content=f'Content {i}',
-                published=True,
-                user_id=user.id
-            )
-            post.save()
+        bulk_create_posts(15, shared_user.id)
 
         response = client.get('/api/v2/posts/?page=1&per_page=10')
         assert response.status_code == 200
@@ -127,27 +190,46 @@ class TestPostsV2:
         assert len(data['data']) == 10
         assert data['meta']['total'] == 15
 
-    def test_search_posts(self, client):
-        """Test post search functionality"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
+    def test_list_posts_loads_authors_with_page(self, client, shared_user, shared_user2):
+        """Test post list fetches authors without a query per post"""
+        bulk_create_posts(5, shared_user.id)
+        bulk_create_posts(5, shared_user2.id)
 
-        post1 = Post(
-            title='Python Tutorial',
-            content='Learn Python programming',
-            published=True,
-            user_id=user.id
-        )
-        post1.save()
+        statements = []
 
-        post2 = Post(
-            title='JavaScript Guide',
-            content='Learn JavaScript',
-            published=True,
-            user_id=user.id
-        )
-        post2.save()
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/api/v2/posts/?per_page=10')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        authors = {post['author_username'] for post in response.get_json()['data']}
+        assert authors == {'testuser', 'user2'}
+        assert len(statements) == 2  # total count + page with authors
+
+    def test_search_posts(self, client, shared_user):
+        """Test post search functionality"""
+        with bulk_commit(db.session):
+            post1 = Post(
+                title='Python Tutorial',
+                content='Learn Python programming',
+                published=True,
+                user_id=shared_user.id
+            )
+            post1.save(commit=False)
+
+            post2 = Post(
+                title='JavaScript Guide',
+                content='Learn JavaScript',
+                published=True,
+                user_id=shared_user.id
+            )
+            post2.save(commit=False)
 
         response = client.get('/api/v2/posts/?q=Python')
         assert response.status_code == 200
@@ -155,12 +237,8 @@ class TestPostsV2:
         assert len(data['data']) == 1
         assert 'Python' in data['data'][0]['title']
 
-    def test_create_post_with_auth(self, client, auth_headers):
+    def test_create_post_with_auth(self, client, shared_user, auth_headers):
         """Test post creation with authentication"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
-
         response = client.post('/api/v2/posts/',
                               json={
                                   'title': 'Test Post',
@@ -172,7 +250,7 @@ class TestPostsV2:
         assert response.status_code == 201
         data = response.get_json()
         assert data['title'] == 'Test Post'
-        assert data['user_id'] == user.id
+        assert data['user_id'] == shared_user.id
 
     def test_create_post_validation(self, client, auth_headers):
         """Test post creation with validation"""
@@ -181,25 +259,17 @@ class TestPostsV2:
                               headers=auth_headers)
         assert response.status_code == 400
 
-    def test_update_post_authorization(self, client, auth_headers):
+    def test_update_post_authorization(self, client, shared_user2, auth_headers):
         """Test post update authorization"""
-        user1 = User(username='user1', email='user1@example.com')
-        user1.set_password('password123')
-        user1.save()
-
-        user2 = User(username='user2', email='user2@example.com')
-        user2.set_password('password123')
-        user2.save()
-
         post = Post(
             title='Original Title',
             content='Original content',
             published=True,
-            user_id=user1.id
+            user_id=shared_user2.id
         )
         post.save()
 
-        # Try to update with user2 (should fail)
+        # Try to update another user's post (should fail)
         response = client.put(f'/api/v2/posts/{post.id}',
                              json={'title': 'Updated Title'},
                              headers=auth_headers)
@@ -209,75 +279,70 @@ class TestPostsV2:
 class TestAuthV2:
     """Test authentication V2"""
 
-    def test_login_with_username(self, client):
+    def test_login_with_username(self, client, shared_user):
         """Test login with username"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
-
-        response = client.post('/api/v2/auth/login',
-                              json={
-                                  'username': 'testuser',
-                                  'password': 'password123'
-                              },
-                              content_type='application/json')
+        response = post_json(client, '/api/v2/auth/login', {
+            'username': 'testuser',
+            'password': 'password123'
+        })
         assert response.status_code == 200
         data = response.get_json()
         assert 'access_token' in data
         assert 'user' in data
         assert data['user']['username'] == 'testuser'
 
-    def test_login_with_email(self, client):
+    def test_login_with_email(self, client, shared_user):
         """Test login with email"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
-
-        response = client.post('/api/v2/auth/login',
-                              json={
-                                  'username': 'test@example.com',
-                                  'password': 'password123'
-                              },
-                              content_type='application/json')
+        response = post_json(client, '/api/v2/auth/login', {
+            'username': 'test@example.com',
+            'password': 'password123'
+        })
         assert response.status_code == 200
         data = response.get_json()
         assert 'access_token' in data
 
     def test_login_invalid_credentials(self, client):
         """Test login with invalid credentials"""
-        response = client.post('/api/v2/auth/login',
-                              json={
-                                  'username': 'nonexistent',
-                                  'password': 'wrongpassword'
-                              },
-                              content_type='application/json')
+        response = post_json(client, '/api/v2/auth/login', {
+            'username': 'nonexistent',
+            'password': 'wrongpassword'
+        })
+        assert response.status_code == 401
+
+    def test_login_unknown_user(self, client):
+        """Test login for an unknown user gets the generic error"""
+        response = post_json(client, '/api/v2/auth/login', {
+            'username': 'nobody',
+            'password': 'password123'
+        })
         assert response.status_code == 401
+        assert response.get_json() == {'error': 'Invalid credentials'}
+
+    def test_login_inactive_user(self, client):
+        """Test login for an inactive user gets the generic error"""
+        user = User(username='inactive', email='inactive@example.com', is_active=False)
+        user.set_password('password123')
+        user.save()
+
+        response = post_json(client, '/api/v2/auth/login', {
+            'username': 'inactive',
+            'password': 'password123'
+        })
+        assert response.status_code == 401
+        assert response.get_json() == {'error': 'Invalid credentials'}
 
     def test_login_validation(self, client):
         """Test login validation"""
-        response = client.post('/api/v2/auth/login',
-                              json={'username': 'test'},
-                              content_type='application/json')
+        response = post_json(client, '/api/v2/auth/login', {'username': 'test'})
         assert response.status_code == 400
 
 
 class TestPagination:
     """Test pagination utilities"""
 
-    def test_page_bounds(self, client):
+    def test_page_bounds(self, client, shared_user):
         """Test pagination page bounds"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
-
-        for i in range(5):
-            post = Post(
-                title=f'Post {i}',
-                content=f'Content {i}',
-                published=True,
-                user_id=user.id
-            )
-            post.save()
+        bulk_create_posts(5, shared_user.id)
 
         # Test page too high
         response = client.get('/api/v2/posts/?page=999')
@@ -285,23 +350,169 @@ class TestPagination:
         data = response.get_json()
         assert data['meta']['page'] == 1  # Should default to page 1
 
-    def test_per_page_limits(self, client):
+    def test_per_page_limits(self, client, shared_user):
         """Test per_page limits"""
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('password123')
-        user.save()
-
-        for i in range(150):
-            post = Post(
-                title=f'Post {i}',
-                content=f'Content {i}',
-                published=True,
-                user_id=user.id
-            )
-            post.save()
+        bulk_create_posts(150, shared_user.id)
 
         # Test per_page too high
         response = client.get('/api/v2/posts/?per_page=200')
         assert response.status_code == 200
         data = response.get_json()
         assert data['meta']['per_page'] == 100  # Should max at 100
+
+    @pytest.mark.parametrize('order', ['asc', 'desc'])
+    def test_cursor_round_trip(self, client, shared_user, order):
+        """Test following next_cursor visits every post once, in order"""
+        bulk_create_posts(7, shared_user.id)
+
+        response = client.get('/api/v2/posts/', query_string={'order': order, 'per_page': 100})
+        expected = [post['id'] for post in response.get_json()['data']]
+
+        seen = []
+        params = {'order': order, 'per_page': 3}
+        while True:
+            response = client.get('/api/v2/posts/', query_string=params)
+            assert response.status_code == 200
+            data = response.get_json()
+            seen.extend(post['id'] for post in data['data'])
+            if data['meta']['next_cursor'] is None:
+                break
+            params['cursor'] = data['meta']['next_cursor']
+
+        assert seen == expected
+        assert data['meta']['has_next'] is False
+
+    def test_cursor_include_total(self, client, shared_user):
+        """Test keyset pages only count rows when include_total=1"""
+        bulk_create_posts(5, shared_user.id)
+        first = client.get('/api/v2/posts/?per_page=2').get_json()
+        cursor = first['meta']['next_cursor']
+
+        response = client.get('/api/v2/posts/', query_string={'per_page': 2, 'cursor': cursor})
+        assert response.status_code == 200
+        assert 'total' not in response.get_json()['meta']
+
+        response = client.get('/api/v2/posts/', query_string={
+            'per_page': 2, 'cursor': cursor, 'include_total': 1
+        })
+        assert response.status_code == 200
+        assert response.get_json()['meta']['total'] == 5
+
+    @pytest.mark.parametrize('params', [
+        {'sort': 'title'},
+        {'order': 'asc'},
+    ], ids=['other_sort', 'other_order'])
+    def test_cursor_sort_mismatch(self, client, shared_user, params):
+        """Test a cursor is rejected when the sort or order changes"""
+        bulk_create_posts(3, shared_user.id)
+        first = client.get('/api/v2/posts/?per_page=1').get_json()
+
+        response = client.get('/api/v2/posts/', query_string={
+            'per_page': 1, 'cursor': first['meta']['next_cursor'], **params
+        })
+        assert response.status_code == 400
+        assert 'cursor' in response.get_json()['messages']
+
+    @pytest.mark.parametrize('sort, value, last_id', [
+        ('id', 'abc', 1),
+        ('id', [1], 1),
+        ('id', {'a': 1}, 1),
+        ('id', True, 1),
+        ('title', 5, 1),
+        ('created_at', 5, 1),
+        ('id', 5, '1'),
+    ], ids=['str_for_int', 'list', 'dict', 'bool_for_int', 'int_for_str',
+            'int_for_datetime', 'str_id'])
+    def test_forged_cursor_value(self, client, sort, value, last_id):
+        """Test a cursor whose value has the wrong type for its column is rejected"""
+        payload = json.dumps([sort, 'desc', value, last_id]).encode()
+        cursor = base64.urlsafe_b64encode(payload).decode()
+
+        response = client.get('/api/v2/posts/', query_string={'sort': sort, 'cursor': cursor})
+        assert response.status_code == 400
+        assert response.get_json()['messages'] == {'cursor': ['Invalid cursor.']}
+
+    @pytest.mark.parametrize('cursor', ['not-a-cursor', 'bnVsbA==', 'WzEsIDJd'],
+                             ids=['not_base64_json', 'null', 'too_short'])
+    def test_malformed_cursor(self, client, cursor):
+        """Test a malformed cursor is rejected rather than restarting at page 1"""
+        response = client.get('/api/v2/posts/', query_string={'cursor': cursor})
+        assert response.status_code == 400
+        assert 'cursor' in response.get_json()['messages']
+
+
+class TestResponseCache:
+    """Test cached list responses are invalidated by writes"""
+
+    @staticmethod
+    def count_selects(client, url):
+        """GET url and return (response, number of SELECTs it ran)"""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        return response, len(statements)
+
+    def test_repeat_list_served_from_cache(self, client, shared_user, response_cache):
+        """Test an unchanged list is answered without querying"""
+        client.get('/api/v2/users/')
+        response, selects = self.count_selects(client, '/api/v2/users/')
+        assert response.status_code == 200
+        assert response.get_json()['meta']['total'] == 1
+        assert selects == 0
+
+    def test_orm_save_invalidates(self, client, shared_user, response_cache):
+        """Test a model save invalidates cached pages"""
+        client.get('/api/v2/users/')
+
+        user = User(username='newuser', email='new@example.com')
+        user.set_password('password123')
+        user.save()
+
+        response = client.get('/api/v2/users/')
+        assert response.get_json()['meta']['total'] == 2
+
+    def test_core_insert_invalidates(self, client, shared_user, response_cache):
+        """Test a Core insert() invalidates cached pages"""
+        client.get('/api/v2/users/')
+
+        bulk_create_users(3)
+
+        response = client.get('/api/v2/users/')
+        assert response.get_json()['meta']['total'] == 4
+
+    def test_bulk_update_invalidates(self, client, shared_user, response_cache):
+        """Test a bulk Query.update() invalidates cached pages"""
+        client.get('/api/v2/users/?username=testuser')
+
+        User.query.filter_by(username='testuser').update({'first_name': 'Changed'})
+        db.session.commit()
+
+        response = client.get('/api/v2/users/?username=testuser')
+        assert response.get_json()['data'][0]['first_name'] == 'Changed'
+
+    def test_cache_outage_is_a_miss(self, client, shared_user, response_cache,
+                                    monkeypatch):
+        """Test writes and lists keep working when the cache backend fails"""
+        def unavailable(*args, **kwargs):
+            raise ConnectionError('cache down')
+
+        monkeypatch.setattr(response_cache, 'get_many', unavailable)
+        monkeypatch.setattr(response_cache, 'set', unavailable)
+
+        user = User(username='newuser', email='new@example.com')
+        user.set_password('password123')
+        user.save()
+        assert User.query.filter_by(username='newuser').count() == 1
+
+        response = client.get('/api/v2/users/')
+        assert response.status_code == 200
+        assert response.get_json()['meta']['total'] == 2
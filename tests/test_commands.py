@@ -0,0 +1,29 @@
+"""
+Tests for CLI Commands
+"""
+import pytest
+from app.models.user import User
+
+
+class TestCreateUsers:
+    """Test the create-users command"""
+
+    def test_create_users_zero_count(self, runner):
+        """Test --count 0 creates nothing and succeeds"""
+        result = runner.invoke(args=['create-users', '--count', '0'])
+        assert result.exit_code == 0, result.output
+        assert '0 users created.' in result.output
+        assert User.query.count() == 0
+
+    def test_create_users(self, runner):
+        """Test users are created in one batch with a shared password"""
+        pytest.importorskip('faker')
+
+        result = runner.invoke(args=['create-users', '--count', '3'])
+        assert result.exit_code == 0, result.output
+        assert '3 users created.' in result.output
+
+        users = User.query.all()
+        assert len(users) == 3
+        assert users[0].check_password('Password123!')
+        assert len({user.password_hash for user in users}) == 1
@@ -8,78 +8,75 @@ from app.schemas import (
     LoginSchema, RegisterSchema, PaginationSchema
 )
 
+# Schemas are stateless for load(), so one instance each serves every test
+USER_SCHEMA = UserSchema()
+USER_UPDATE_SCHEMA = UserUpdateSchema()
+POST_SCHEMA = PostSchema()
+POST_UPDATE_SCHEMA = PostUpdateSchema()
+LOGIN_SCHEMA = LoginSchema()
+PAGINATION_SCHEMA = PaginationSchema()
+
+# Canonical valid records; negative cases override a single field
+VALID_USER = {
+    'username': 'testuser',
+    'email': 'test@example.com',
+    'password': 'password123',
+    'first_name': 'Test',
+    'last_name': 'User'
+}
+VALID_POST = {
+    'title': 'Test Post',
+    'content': 'This is test content',
+    'summary': 'Test summary',
+    'published': True
+}
+VALID_LOGIN = {
+    'username': 'testuser',
+    'password': 'password123'
+}
+VALID_PAGINATION = {
+    'page': 2,
+    'per_page': 25,
+    'q': 'search query',
+    'sort': 'created_at',
+    'order': 'asc'
+}
+
 
 class TestUserValidation:
     """Test user validation schemas"""
 
     def test_valid_user_schema(self):
         """Test valid user data"""
-        schema = UserSchema()
-        data = {
-            'username': 'testuser',
-            'email': 'test@example.com',
-            'password': 'password123',
-            'first_name': 'Test',
-            'last_name': 'User'
-        }
-        result = schema.load(data)
+        result = USER_SCHEMA.load(VALID_USER)
         assert result['username'] == 'testuser'
         assert result['email'] == 'test@example.com'
 
     def test_missing_required_fields(self):
         """Test missing required fields"""
-        schema = UserSchema()
         data = {'username': 'testuser'}
         with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
-        errors = exc_info.value.messages
-        assert 'email' in errors
-        assert 'password' in errors
-
-    def test_invalid_email(self):
-        """Test invalid email format"""
-        schema = UserSchema()
-        data = {
-            'username': 'testuser',
-            'email': 'invalid-email',
-            'password': 'password123'
-        }
-        with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
+            USER_SCHEMA.load(data)
         errors = exc_info.value.messages
         assert 'email' in errors
-
-    def test_short_password(self):
-        """Test password too short"""
-        schema = UserSchema()
-        data = {
-            'username': 'testuser',
-            'email': 'test@example.com',
-            'password': '12345'
-        }
-        with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
-        errors = exc_info.value.messages
         assert 'password' in errors
 
-    def test_username_too_short(self):
-        """Test username too short"""
-        schema = UserSchema()
-        data = {
-            'username': 'ab',
-            'email': 'test@example.com',
-            'password': 'password123'
-        }
+    @pytest.mark.parametrize('data, bad_field', [
+        ({**VALID_USER, 'email': 'invalid-email'}, 'email'),
+        ({**VALID_USER, 'password': '12345'}, 'password'),
+        ({**VALID_USER, 'username': 'ab'}, 'username'),
+    ], ids=['invalid_email', 'short_password', 'username_too_short'])
+    def test_invalid_user_field(self, data, bad_field):
+        """Test invalid email, short password, and short username"""
         with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
+            USER_SCHEMA.load(data)
         errors = exc_info.value.messages
-        assert 'username' in errors
+        assert bad_field in errors
 
     def test_user_update_schema_all_optional(self):
         """Test user update schema allows partial data"""
-        schema = UserUpdateSchema()
         data = {'first_name': 'Updated'}
-        result = schema.load(data)
+        result = USER_UPDATE_SCHEMA.load(data)
         assert result['first_name'] == 'Updated'
 
 
@@ -88,56 +85,33 @@ class TestPostValidation:
 
     def test_valid_post_schema(self):
         """Test valid post data"""
-        schema = PostSchema()
-        data = {
-            'title': 'Test Post',
-            'content': 'This is test content',
-            'summary': 'Test summary',
-            'published': True
-        }
-        result = schema.load(data)
+        result = POST_SCHEMA.load(VALID_POST)
         assert result['title'] == 'Test Post'
         assert result['published'] == True
 
     def test_missing_required_post_fields(self):
         """Test missing required post fields"""
-        schema = PostSchema()
         data = {'title': 'Test Post'}
         with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
+            POST_SCHEMA.load(data)
         errors = exc_info.value.messages
         assert 'content' in errors
 
-    def test_post_title_too_long(self):
-        """Test post title exceeds max length"""
-        schema = PostSchema()
-        data = {
-            'title': 'x' * 201,
-            'content': 'Test content'
-        }
-        with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
-        errors = exc_info.value.messages
-        assert 'title' in errors
-
-    def test_post_summary_too_long(self):
-        """Test post summary exceeds max length"""
-        schema = PostSchema()
-        data = {
-            'title': 'Test Post',
-            'content': 'Test content',
-            'summary': 'x' * 501
-        }
+    @pytest.mark.parametrize('data, bad_field', [
+        ({**VALID_POST, 'title': 'x' * 201}, 'title'),
+        ({**VALID_POST, 'summary': 'x' * 501}, 'summary'),
+    ], ids=['title_too_long', 'summary_too_long'])
+    def test_post_field_too_long(self, data, bad_field):
+        """Test post title and summary exceed max length"""
         with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
+            POST_SCHEMA.load(data)
         errors = exc_info.value.messages
-        assert 'summary' in errors
+        assert bad_field in errors
 
     def test_post_update_allows_partial(self):
         """Test post update allows partial data"""
-        schema = PostUpdateSchema()
         data = {'title': 'Updated Title'}
-        result = schema.load(data)
+        result = POST_UPDATE_SCHEMA.load(data)
         assert result['title'] == 'Updated Title'
 
 
@@ -146,20 +120,14 @@ class TestAuthValidation:
 
     def test_valid_login(self):
         """Test valid login data"""
-        schema = LoginSchema()
-        data = {
-            'username': 'testuser',
-            'password': 'password123'
-        }
-        result = schema.load(data)
+        result = LOGIN_SCHEMA.load(VALID_LOGIN)
         assert result['username'] == 'testuser'
 
     def test_missing_login_fields(self):
         """Test missing login fields"""
-        schema = LoginSchema()
         data = {'username': 'testuser'}
         with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
+            LOGIN_SCHEMA.load(data)
         errors = exc_info.value.messages
         assert 'password' in errors
 
@@ -169,60 +137,28 @@ class TestPaginationValidation:
 
     def test_valid_pagination(self):
         """Test valid pagination parameters"""
-        schema = PaginationSchema()
-        data = {
-            'page': 2,
-            'per_page': 25,
-            'q': 'search query',
-            'sort': 'created_at',
-            'order': 'asc'
-        }
-        result = schema.load(data)
+        result = PAGINATION_SCHEMA.load(VALID_PAGINATION)
         assert result['page'] == 2
         assert result['per_page'] == 25
         assert result['order'] == 'asc'
 
     def test_default_values(self):
         """Test default pagination values"""
-        schema = PaginationSchema()
-        result = schema.load({})
+        result = PAGINATION_SCHEMA.load({})
         assert result['page'] == 1
         assert result['per_page'] == 20
         assert result['sort'] == 'created_at'
         assert result['order'] == 'desc'
 
-    def test_invalid_page_number(self):
-        """Test invalid page number"""
-        schema = PaginationSchema()
-        data = {'page': 0}
-        with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
-        errors = exc_info.value.messages
-        assert 'page' in errors
-
-    def test_invalid_per_page(self):
-        """Test invalid per_page value"""
-        schema = PaginationSchema()
-        data = {'per_page': 0}
-        with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
-        errors = exc_info.value.messages
-        assert 'per_page' in errors
-
-    def test_per_page_exceeds_max(self):
-        """Test per_page exceeds maximum"""
-        schema = PaginationSchema()
-        data = {'per_page': 150}
-        with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
-        errors = exc_info.value.messages
-        assert 'per_page' in errors
-
-    def test_invalid_order_value(self):
-        """Test invalid sort order"""
-        schema = PaginationSchema()
-        data = {'order': 'invalid'}
+    @pytest.mark.parametrize('data, bad_field', [
+        ({'page': 0}, 'page'),
+        ({'per_page': 0}, 'per_page'),
+        ({'per_page': 150}, 'per_page'),
+        ({'order': 'invalid'}, 'order'),
+    ], ids=['invalid_page', 'invalid_per_page', 'per_page_exceeds_max', 'invalid_order'])
+    def test_invalid_pagination_value(self, data, bad_field):
+        """Test invalid page, per_page, and sort order values"""
         with pytest.raises(ValidationError) as exc_info:
-            schema.load(data)
+            PAGINATION_SCHEMA.load(data)
         errors = exc_info.value.messages
-        assert 'order' in errors
+        assert bad_field in errors
@@ -0,0 +1,50 @@
+"""
+Test Data Helpers
+
+Bulk helpers insert through the Core tables, skipping model construction,
+the identity map, and ORM flush events.
+"""
+from functools import lru_cache
+from sqlalchemy import insert
+from app import bcrypt
+from app.models import db
+from app.models.user import User, Post
+
+
+@lru_cache(maxsize=None)
+def password_hash(password='password123'):
+    """Hash a password once per test run for fixture data"""
+    return bcrypt.generate_password_hash(password).decode('utf-8')
+
+
+def bulk_create_users(count, password='password123'):
+    """Insert count users in one statement, reusing one password hash"""
+    hashed = password_hash(password)
+    db.session.execute(insert(User.__table__), [
+        {
+            'username': f'testuser{i}',
+            'email': f'test{i}@example.com',
+            'password_hash': hashed
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def bulk_create_posts(count, user_id, published=True):
+    """Insert count posts for a user in one statement"""
+    db.session.execute(insert(Post.__table__), [
+        {
+            'title': f'Post {i}',
+            'content': f'Content {i}',
+            'published': published,
+            'user_id': user_id
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def post_json(client, url, payload, headers=None):
+    """POST a JSON body (the test client sets the content type)"""
+    return client.post(url, json=payload, headers=headers)